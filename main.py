@@ -1,14 +1,46 @@
 import os
+import time
+import asyncio
+import functools
+import hashlib
+import zipfile
 from io import BytesIO
+from pathlib import Path
 from datetime import datetime
-from fastapi import FastAPI
+from typing import Sequence
+import orjson
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import Response, JSONResponse
 
 # PPTX imports
+import pptx
 from pptx import Presentation
+from pptx.slide import SlideLayout
 from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN
+from pptx.oxml.ns import qn
+from lxml import etree
+
+# python-pptx's bundled default template, read from disk once
+_DEFAULT_PPTX_BYTES = Path(pptx.__file__).with_name("templates").joinpath("default.pptx").read_bytes()
+
+# Slide geometry and font sizes, computed once
+_LEFT_X, _TOP_Y, _COL_W, _COL_H = Inches(0.7), Inches(1.6), Inches(4.3), Inches(5)
+_RIGHT_X = Inches(5.2)
+_TITLE_PT, _ITEM_PT, _CLOSE_PT = Pt(20), Pt(16), Pt(18)
+_CLOSE_BOX = (Inches(1.2), Inches(2.2), Inches(8), Inches(3))
+
+# Load .env up front so the environment flags below can be read once
+load_dotenv()
+
+# Import the optional database module once instead of on every /test hit
+try:
+    from database import db as _DB
+    _DB_IMPORT_ERR = None
+except Exception as e:
+    _DB = None
+    _DB_IMPORT_ERR = e
 
 app = FastAPI()
 
@@ -20,17 +52,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Static JSON bodies, serialized once
+_ROOT_BYTES = orjson.dumps({"message": "Hello from FastAPI Backend!"})
+_HELLO_BYTES = orjson.dumps({"message": "Hello from the backend API!"})
+
 @app.get("/")
-def read_root():
-    return {"message": "Hello from FastAPI Backend!"}
+async def read_root():
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 @app.get("/api/hello")
-def hello():
-    return {"message": "Hello from the backend API!"}
+async def hello():
+    return Response(content=_HELLO_BYTES, media_type="application/json")
 
-@app.get("/test")
-def test_database():
-    """Test endpoint to check if database is available and accessible"""
+# Environment does not change at runtime, so read it once
+_DATABASE_URL_STATUS = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
+_DATABASE_NAME_STATUS = "✅ Set" if os.getenv("DATABASE_NAME") else "❌ Not Set"
+
+# Last /test result, reused for a few seconds to avoid a Mongo round-trip per hit
+_DB_STATUS_TTL = 10.0
+_DB_STATUS = {"ts": 0.0, "data": None}
+# Only one coroutine refreshes an expired entry; the rest wait and reuse it
+_DB_STATUS_LOCK = asyncio.Lock()
+
+
+def _db_status_stale() -> bool:
+    return _DB_STATUS["data"] is None or time.monotonic() - _DB_STATUS["ts"] > _DB_STATUS_TTL
+
+
+def _probe_database() -> dict:
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -40,215 +89,341 @@ def test_database():
         "collections": []
     }
     try:
-        from database import db
-        if db is not None:
+        if isinstance(_DB_IMPORT_ERR, ImportError):
+            response["database"] = "❌ Database module not found (run enable-database first)"
+        elif _DB_IMPORT_ERR is not None:
+            response["database"] = f"❌ Error: {str(_DB_IMPORT_ERR)[:50]}"
+        elif _DB is not None:
             response["database"] = "✅ Available"
             response["database_url"] = "✅ Configured"
-            response["database_name"] = db.name if hasattr(db, 'name') else "✅ Connected"
+            response["database_name"] = _DB.name if hasattr(_DB, 'name') else "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = _DB.list_collection_names()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
                 response["database"] = f"⚠️  Connected but Error: {str(e)[:50]}"
         else:
             response["database"] = "⚠️  Available but not initialized"
-    except ImportError:
-        response["database"] = "❌ Database module not found (run enable-database first)"
     except Exception as e:
         response["database"] = f"❌ Error: {str(e)[:50]}"
 
-    response["database_url"] = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
-    response["database_name"] = "✅ Set" if os.getenv("DATABASE_NAME") else "❌ Not Set"
+    response["database_url"] = _DATABASE_URL_STATUS
+    response["database_name"] = _DATABASE_NAME_STATUS
     return response
 
 
-def _add_title_slide(prs: Presentation, title: str, subtitle: str = ""):
-    slide_layout = prs.slide_layouts[0]
-    slide = prs.slides.add_slide(slide_layout)
+@app.get("/test")
+async def test_database():
+    """Test endpoint to check if database is available and accessible"""
+    if _db_status_stale():
+        async with _DB_STATUS_LOCK:
+            if _db_status_stale():
+                _DB_STATUS["data"] = await asyncio.to_thread(_probe_database)
+                _DB_STATUS["ts"] = time.monotonic()
+    return _DB_STATUS["data"]
+
+
+def _add_title_slide(prs: Presentation, title: str, subtitle: str = "", layout: SlideLayout | None = None):
+    slide = prs.slides.add_slide(layout or prs.slide_layouts[0])
     slide.shapes.title.text = title
     slide.placeholders[1].text = subtitle
+    return slide
 
 
-def _add_bullets_slide(prs: Presentation, title: str, bullets: list[str]):
-    slide_layout = prs.slide_layouts[1]  # Title and Content
-    slide = prs.slides.add_slide(slide_layout)
+def _make_paragraphs(bullets: Sequence[str], size: Pt = None) -> list:
+    """Build one detached <a:p> element per bullet"""
+    paragraphs = []
+    for text in bullets:
+        p = etree.Element(qn("a:p"))
+        pPr = etree.SubElement(p, qn("a:pPr"))
+        if size is not None:
+            etree.SubElement(pPr, qn("a:defRPr"), sz=str(size.centipoints))
+        r = etree.SubElement(p, qn("a:r"))
+        etree.SubElement(r, qn("a:t")).text = text
+        paragraphs.append(p)
+    return paragraphs
+
+
+def _bulk_add_paragraphs(tf, bullets: Sequence[str], size: Pt = None):
+    """Append one <a:p> per bullet to the text frame with a single lxml extend"""
+    tf._txBody.extend(_make_paragraphs(bullets, size))
+
+
+def _add_bullets_slide(prs: Presentation, title: str, bullets: Sequence[str], layout: SlideLayout | None = None):
+    slide = prs.slides.add_slide(layout or prs.slide_layouts[1])  # Title and Content
     slide.shapes.title.text = title
     tf = slide.shapes.placeholders[1].text_frame
-    tf.clear()
-    for i, b in enumerate(bullets):
-        if i == 0:
-            p = tf.paragraphs[0]
-        else:
-            p = tf.add_paragraph()
-        p.text = b
-        p.level = 0
+    if bullets:
+        tf._txBody.clear_content()
+        _bulk_add_paragraphs(tf, bullets)
+    else:
+        # txBody must keep at least one <a:p>; clear() leaves an empty one
+        tf.clear()
+    return slide
+
 
+def _render_column(tf, title_text: str, items: Sequence[str]):
+    """Emit a column's bold heading and its bullets with a single lxml extend"""
+    tf.word_wrap = True
+    heading = etree.Element(qn("a:p"))
+    etree.SubElement(heading, qn("a:pPr"), algn="l")
+    r = etree.SubElement(heading, qn("a:r"))
+    etree.SubElement(r, qn("a:rPr"), b="1", sz=str(_TITLE_PT.centipoints))
+    etree.SubElement(r, qn("a:t")).text = title_text
+    # The heading keeps txBody non-empty even when there are no items
+    tf._txBody.clear_content()
+    tf._txBody.extend([heading, *_make_paragraphs([f"• {it}" for it in items], size=_ITEM_PT)])
 
-def _add_two_column_slide(prs: Presentation, title: str, left_title: str, left_items: list[str], right_title: str, right_items: list[str]):
-    slide_layout = prs.slide_layouts[5]  # Title Only
-    slide = prs.slides.add_slide(slide_layout)
+
+def _add_two_column_slide(prs: Presentation, title: str, left_title: str, left_items: Sequence[str], right_title: str, right_items: Sequence[str], layout: SlideLayout | None = None):
+    slide = prs.slides.add_slide(layout or prs.slide_layouts[5])  # Title Only
     slide.shapes.title.text = title
 
-    left_box = slide.shapes.add_textbox(Inches(0.7), Inches(1.6), Inches(4.3), Inches(5))
-    right_box = slide.shapes.add_textbox(Inches(5.2), Inches(1.6), Inches(4.3), Inches(5))
-
-    for title_text, items, box in [
-        (left_title, left_items, left_box),
-        (right_title, right_items, right_box)
-    ]:
-        tf = box.text_frame
-        tf.word_wrap = True
-        p = tf.paragraphs[0]
-        run = p.add_run()
-        run.text = title_text
-        run.font.bold = True
-        run.font.size = Pt(20)
-        p.alignment = PP_ALIGN.LEFT
-        # items
-        for it in items:
-            pi = tf.add_paragraph()
-            pi.text = f"• {it}"
-            pi.level = 0
-            pi.font.size = Pt(16)
-
-
-def build_ipb_ui_presentation() -> BytesIO:
-    prs = Presentation()
-
-    # Title
-    _add_title_slide(
-        prs,
-        "Profil IPB University & Universitas Indonesia",
-        "Ringkasan jalur masuk dan fakultas (disusun otomatis)"
-    )
+    left_box = slide.shapes.add_textbox(_LEFT_X, _TOP_Y, _COL_W, _COL_H)
+    right_box = slide.shapes.add_textbox(_RIGHT_X, _TOP_Y, _COL_W, _COL_H)
+
+    _render_column(left_box.text_frame, left_title, left_items)
+    _render_column(right_box.text_frame, right_title, right_items)
+    return slide
+
+
+def _add_closing_slide(prs: Presentation, title: str, text: str, layout: SlideLayout | None = None):
+    slide = prs.slides.add_slide(layout or prs.slide_layouts[5])  # Title Only
+    slide.shapes.title.text = title
+    box = slide.shapes.add_textbox(*_CLOSE_BOX)
+    p = box.text_frame.paragraphs[0]
+    p.text = text
+    p.font.size = _CLOSE_PT
+    return slide
+
+
+def _presized_buffer(size: int) -> BytesIO:
+    bio = BytesIO()
+    if size:
+        bio.write(bytearray(size))
+        bio.seek(0)
+    return bio
 
-    # IPB Overview
-    _add_bullets_slide(
-        prs,
+
+def _save_presentation(prs: Presentation) -> bytes:
+    bio = BytesIO()
+    # python-pptx already writes every part ZIP_DEFLATED; re-zipping at a
+    # higher level only saves ~0.3% on this deck, so no extra pass here
+    prs.save(bio)
+    return bio.getvalue()
+
+
+# Stands in for the generation date in the prebuilt template
+_DATE_PLACEHOLDER = "{{DATE}}"
+
+# The whole deck as data: (kind, *renderer args), one entry per slide
+_DECK = (
+    (
+        "title",
+        "Profil IPB University & Universitas Indonesia",
+        "Ringkasan jalur masuk dan fakultas (disusun otomatis)",
+    ),
+    (
+        "bullets",
         "IPB University – Ringkasan",
-        [
+        (
             "Perguruan tinggi negeri unggul berlokasi di Bogor, Jawa Barat",
             "Bertransformasi menjadi Techno-Socio Entrepreneurial University",
             "Keunggulan: biosains tropika, pertanian, kelautan, dan teknologi terkait",
             "Sering masuk Top 50 dunia untuk Pertanian & Kehutanan (QS WUR)",
             "Akreditasi: Unggul; Program: Vokasi hingga Pascasarjana",
-            "Kampus utama di Dramaga; inovasi untuk kemandirian pangan & keberlanjutan"
-        ]
-    )
-
-    # IPB Jalur Masuk
-    _add_bullets_slide(
-        prs,
+            "Kampus utama di Dramaga; inovasi untuk kemandirian pangan & keberlanjutan",
+        ),
+    ),
+    (
+        "bullets",
         "IPB – Jalur Masuk",
-        [
+        (
             "SNBP",
             "SNBT",
             "AFIRMASI DIKTI",
             "MANDIRI (Ketua OSIS, Talenta, SM-IPB, BUD, Kelas Internasional)",
-        ]
-    )
-
-    # IPB Fakultas (split into two slides if long)
-    ipb_fakultas = [
-        "Fakultas Pertanian",
-        "Fakultas Perikanan dan Ilmu Kelautan (FPIK)",
-        "Fakultas Peternakan (FAPET)",
-        "Fakultas Kehutanan dan Lingkungan (FKL)",
-        "Fakultas Teknologi Pertanian (FATETA)",
-        "Fakultas Matematika dan Ilmu Pengetahuan Alam (FMIPA)",
-        "Fakultas Ekonomi dan Manajemen (FEM)",
-        "Fakultas Ekologi Manusia (FEMA)",
-        "Sekolah Kedokteran Hewan dan Biomedis (SKHB)",
-        "Sekolah Bisnis (SB)",
-        "Sekolah Vokasi (SV)",
-    ]
-    _add_bullets_slide(prs, "IPB – Fakultas & Sekolah", ipb_fakultas)
-
-    # UI Overview
-    _add_bullets_slide(
-        prs,
+        ),
+    ),
+    (
+        "bullets",
+        "IPB – Fakultas & Sekolah",
+        (
+            "Fakultas Pertanian",
+            "Fakultas Perikanan dan Ilmu Kelautan (FPIK)",
+            "Fakultas Peternakan (FAPET)",
+            "Fakultas Kehutanan dan Lingkungan (FKL)",
+            "Fakultas Teknologi Pertanian (FATETA)",
+            "Fakultas Matematika dan Ilmu Pengetahuan Alam (FMIPA)",
+            "Fakultas Ekonomi dan Manajemen (FEM)",
+            "Fakultas Ekologi Manusia (FEMA)",
+            "Sekolah Kedokteran Hewan dan Biomedis (SKHB)",
+            "Sekolah Bisnis (SB)",
+            "Sekolah Vokasi (SV)",
+        ),
+    ),
+    (
+        "bullets",
         "Universitas Indonesia – Ringkasan",
-        [
+        (
             "PTN-BH tertua dan prestisius di Indonesia",
             "Kampus utama Green Campus di Depok; Kampus Salemba di Jakarta",
             "Kampus komprehensif dan multikultural, program Vokasi hingga Doktor",
             "14 Fakultas mencakup Kesehatan, Saintek, dan Soshum",
             "Peringkat teratas nasional dengan pengakuan global",
             "Fokus: riset, inovasi, pengabdian masyarakat; lulusan berdaya saing tinggi",
-        ]
-    )
-
-    # UI Jalur Masuk
-    _add_bullets_slide(
-        prs,
+        ),
+    ),
+    (
+        "bullets",
         "UI – Jalur Masuk",
-        [
+        (
             "SNBP",
             "SNBT",
             "SIMAK UI",
             "Talent Scouting",
             "PPKB",
             "Seleksi Jalur Prestasi",
-        ]
-    )
-
-    # UI Fakultas by rumpun
-    kesehatan = [
-        "Fakultas Kedokteran (FK)",
-        "Fakultas Kedokteran Gigi (FKG)",
-        "Fakultas Ilmu Keperawatan (FIK)",
-        "Fakultas Kesehatan Masyarakat (FKM)",
-        "Fakultas Farmasi (FF)",
-    ]
-    saintek = [
-        "Fakultas Teknik (FT)",
-        "Fakultas Matematika dan Ilmu Pengetahuan Alam (FMIPA)",
-        "Fakultas Ilmu Komputer (Fasilkom)",
-    ]
-    soshum = [
-        "Fakultas Hukum (FH)",
-        "Fakultas Ekonomi dan Bisnis (FEB)",
-        "Fakultas Ilmu Pengetahuan Budaya (FIB)",
-        "Fakultas Psikologi (FPsi)",
-        "Fakultas Ilmu Sosial dan Ilmu Politik (FISIP)",
-        "Fakultas Ilmu Administrasi (FIA)",
-    ]
-    lainnya = [
-        "Program Pendidikan Vokasi",
-        "Sekolah Ilmu Lingkungan (SIL)",
-        "Sekolah Kajian Stratejik dan Global (SKSG)",
-    ]
-
-    _add_two_column_slide(prs, "UI – Fakultas (Kesehatan & Saintek)", "Rumpun Kesehatan", kesehatan, "Rumpun Saintek", saintek)
-    _add_two_column_slide(prs, "UI – Fakultas (Soshum & Program Lain)", "Rumpun Soshum", soshum, "Program/Sekolah Lain", lainnya)
-
-    # Closing slide
-    slide_layout = prs.slide_layouts[5]
-    slide = prs.slides.add_slide(slide_layout)
-    slide.shapes.title.text = "Terima kasih"
-    box = slide.shapes.add_textbox(Inches(1.2), Inches(2.2), Inches(8), Inches(3))
-    tf = box.text_frame
-    p = tf.paragraphs[0]
-    p.text = f"Disusun otomatis pada {datetime.now().strftime('%d %B %Y')}"
-    p.font.size = Pt(18)
+        ),
+    ),
+    (
+        "two_col",
+        "UI – Fakultas (Kesehatan & Saintek)",
+        "Rumpun Kesehatan",
+        (
+            "Fakultas Kedokteran (FK)",
+            "Fakultas Kedokteran Gigi (FKG)",
+            "Fakultas Ilmu Keperawatan (FIK)",
+            "Fakultas Kesehatan Masyarakat (FKM)",
+            "Fakultas Farmasi (FF)",
+        ),
+        "Rumpun Saintek",
+        (
+            "Fakultas Teknik (FT)",
+            "Fakultas Matematika dan Ilmu Pengetahuan Alam (FMIPA)",
+            "Fakultas Ilmu Komputer (Fasilkom)",
+        ),
+    ),
+    (
+        "two_col",
+        "UI – Fakultas (Soshum & Program Lain)",
+        "Rumpun Soshum",
+        (
+            "Fakultas Hukum (FH)",
+            "Fakultas Ekonomi dan Bisnis (FEB)",
+            "Fakultas Ilmu Pengetahuan Budaya (FIB)",
+            "Fakultas Psikologi (FPsi)",
+            "Fakultas Ilmu Sosial dan Ilmu Politik (FISIP)",
+            "Fakultas Ilmu Administrasi (FIA)",
+        ),
+        "Program/Sekolah Lain",
+        (
+            "Program Pendidikan Vokasi",
+            "Sekolah Ilmu Lingkungan (SIL)",
+            "Sekolah Kajian Stratejik dan Global (SKSG)",
+        ),
+    ),
+    ("closing", "Terima kasih", f"Disusun otomatis pada {_DATE_PLACEHOLDER}"),
+)
 
-    bio = BytesIO()
-    prs.save(bio)
-    bio.seek(0)
-    return bio
+_RENDERERS = {
+    "title": _add_title_slide,
+    "bullets": _add_bullets_slide,
+    "two_col": _add_two_column_slide,
+    "closing": _add_closing_slide,
+}
+
+
+def _build_template() -> tuple[bytes, str]:
+    """Build the static deck once; returns the pptx bytes and the closing slide's zip member name"""
+    prs = Presentation(BytesIO(_DEFAULT_PPTX_BYTES))
+    # Each slide_layouts[i] access walks the master's relationships, so bind once
+    title_only_layout = prs.slide_layouts[5]
+    layouts = {
+        "title": prs.slide_layouts[0],
+        "bullets": prs.slide_layouts[1],
+        "two_col": title_only_layout,
+        "closing": title_only_layout,
+    }
+
+    closing_part = None
+    for kind, *args in _DECK:
+        slide = _RENDERERS[kind](prs, *args, layout=layouts[kind])
+        if kind == "closing":
+            closing_part = slide.part.partname.membername
+
+    return _save_presentation(prs), closing_part
+
+
+_TEMPLATE_BYTES, _CLOSING_SLIDE_PART = _build_template()
+
+
+@functools.lru_cache(maxsize=8)
+def _build_raw_bytes(date_key: str) -> bytes:
+    """Stamp the day's date into the closing slide of the prebuilt template"""
+    day = datetime.strptime(date_key, "%Y-%m-%d")
+    date_text = day.strftime("%d %B %Y")
+    # Pin entry timestamps to the day so the bytes (and ETag) match across restarts
+    stamp = (day.year, day.month, day.day, 0, 0, 0)
+    bio = _presized_buffer(len(_TEMPLATE_BYTES))
+    with zipfile.ZipFile(BytesIO(_TEMPLATE_BYTES)) as src, zipfile.ZipFile(bio, "w", zipfile.ZIP_DEFLATED) as out:
+        for info in src.infolist():
+            data = src.read(info)
+            info.date_time = stamp
+            if info.filename == _CLOSING_SLIDE_PART:
+                data = data.replace(_DATE_PLACEHOLDER.encode(), date_text.encode())
+            out.writestr(info, data)
+    bio.truncate()
+    return bio.getvalue()
+
+
+@functools.lru_cache(maxsize=8)
+def _deck_etag(date_key: str) -> str:
+    """Strong ETag for the day's cached deck bytes"""
+    return f'"{hashlib.blake2b(_build_raw_bytes(date_key), digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _today_key() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+# Warm the cache so the first request is already served from memory;
+# _WARM_DAY tracks the day whose bytes are known to be cached
+_WARM_DAY = _today_key()
+_deck_etag(_WARM_DAY)
 
 
 @app.get("/api/ppt/ipb-ui")
-def generate_ppt_ipb_ui():
+async def generate_ppt_ipb_ui(request: Request):
+    global _WARM_DAY
     try:
-        stream = build_ipb_ui_presentation()
+        date_key = _today_key()
+        if date_key == _WARM_DAY:
+            data = _build_raw_bytes(date_key)
+        else:
+            # Stamping a new day's deck is CPU-bound; keep it off the event loop
+            data = await asyncio.to_thread(_build_raw_bytes, date_key)
+            _WARM_DAY = date_key
+        etag = _deck_etag(date_key)
+        # no-cache: clients keep the deck but revalidate, so the date stays current
+        cache_headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=cache_headers)
         filename = "Profil_IPB_dan_UI.pptx"
         headers = {
-            "Content-Disposition": f"attachment; filename={filename}"
+            **cache_headers,
+            "Content-Disposition": f'attachment; filename="{filename}"'
         }
-        return StreamingResponse(stream, media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation", headers=headers)
+        return Response(content=data, media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation", headers=headers)
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 